@@ -1,39 +1,99 @@
 import streamlit as st
 from PIL import Image
-from fpdf import FPDF
 import io
 
+# File extensions accepted by the uploader
+ALLOWED_IMAGE_TYPES = ("jpg", "jpeg", "png")
+
+# Largest size (in pixels) an upload is kept at; a 190mm-wide PDF image
+# gains nothing from full-resolution camera photos
+MAX_IMAGE_SIZE = (1600, 1600)
+
+# On-screen previews only need to fill the page column
+PREVIEW_SIZE = (800, 800)
+
+# Bounds for the per-process caches; each upload holds a prepared image,
+# a preview and a PDF, and sessions only ever work on one upload at a time
+CACHE_MAX_ENTRIES = 32
+CACHE_TTL = 60 * 60  # Seconds
+
+@st.cache_data(show_spinner=False, max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL)
+def prepare_image(image_bytes, max_size=MAX_IMAGE_SIZE):
+    # Downscale and re-encode once so later reruns reuse the small copy
+    # Only the formats the uploader accepts are sniffed for
+    image = Image.open(io.BytesIO(image_bytes), formats=("JPEG", "PNG"))
+
+    max_width, max_height = max_size
+    fits = image.width <= max_width and image.height <= max_height
+    if not fits:
+        # Let libjpeg scale down while decoding (a no-op for PNG). Stop at twice
+        # the target, as thumbnail()'s own draft would, so LANCZOS does the rest
+        image.draft("RGB", (2 * max_width, 2 * max_height))
+    image.load()  # Decodes once and raises on truncated or corrupt data
+
+    if fits and image.format in ("JPEG", "PNG"):
+        # Already small enough and in a format st.image serves as-is; MPO
+        # (multi-frame camera JPEGs) falls through and is re-encoded as JPEG
+        return image_bytes, image.format
+
+    image.thumbnail(max_size, Image.Resampling.LANCZOS)
+
+    prepared = io.BytesIO()
+    if image.format == "PNG":
+        # Keep transparency, palettes and lossless content intact
+        image_format = "PNG"
+        image.save(prepared, format=image_format, optimize=True)
+    else:
+        # JPEG sources are L, RGB or CMYK, all of which JPEG can store
+        image_format = "JPEG"
+        image.save(prepared, format=image_format, quality=82, optimize=True)
+    return prepared.getvalue(), image_format
+
+@st.cache_data(show_spinner=False, max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL)
+def build_pdf(image_bytes):
+    # Cached on the upload's bytes so reruns don't rebuild an unchanged PDF
+    from fpdf import FPDF  # Imported here to keep it off the startup path
+
+    pdf = FPDF()
+    pdf.add_page()
+    # prepare_image() yields JPEG or PNG; fpdf embeds JPEG as-is and re-deflates PNG
+    pdf.image(io.BytesIO(image_bytes), x=10, y=10, w=190)  # Adjust dimensions as necessary
+
+    return bytes(pdf.output())
+
 def main():
     st.title("Image Upload Application")
 
     # File uploader widget
-    uploaded_file = st.file_uploader("Upload an image", type=["jpg", "jpeg", "png"])
+    uploaded_file = st.file_uploader("Upload an image", type=ALLOWED_IMAGE_TYPES)
 
     if uploaded_file is not None:
-        # Open the image file
-        image = Image.open(uploaded_file)
+        # Read the upload once and work from the in-memory bytes
+        try:
+            image_bytes, _ = prepare_image(uploaded_file.getvalue())
+            # Preview-sized copy for display rather than the PDF-resolution image
+            preview_bytes, preview_format = prepare_image(image_bytes, PREVIEW_SIZE)
+        except (OSError, Image.DecompressionBombError):
+            st.error("The uploaded file could not be read as an image.")
+            return
 
-        # Display the image
-        st.image(image, caption="Uploaded Image", use_container_width=True)
+        # Display the preview
+        st.image(
+            preview_bytes,
+            caption="Uploaded Image",
+            use_column_width=True,
+            output_format=preview_format
+        )
 
         st.write("Image successfully uploaded and displayed.")
 
         # Save the image to a PDF
-        pdf = FPDF()
-        pdf.add_page()
-        img_temp = io.BytesIO()
-        image.save(img_temp, format="PNG")
-        img_temp.seek(0)
-        pdf.image(img_temp, x=10, y=10, w=190)  # Adjust dimensions as necessary
+        pdf_bytes = build_pdf(image_bytes)
 
         # Create a button to download the PDF
-        pdf_output = io.BytesIO()
-        pdf.output(pdf_output)
-        pdf_output.seek(0)
-
         st.download_button(
             label="Download Image as PDF",
-            data=pdf_output,
+            data=pdf_bytes,
             file_name="uploaded_image.pdf",
             mime="application/pdf"
         )